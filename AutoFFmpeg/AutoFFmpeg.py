@@ -9,6 +9,7 @@ import subprocess
 import json
 import math
 import time
+import bisect
 
 try:
     from Deadline.Events import DeadlineEventListener
@@ -33,6 +34,7 @@ CODEC_CONFIGS = {
         'name': 'H.265/HEVC',
         'container': 'mp4',
         'gpu_encoder': 'hevc_nvenc',
+        'gpu_encoders': {'nvidia': 'hevc_nvenc', 'amd': 'hevc_amf', 'intel': 'hevc_qsv'},
         'cpu_encoder': 'libx265',
         'file_suffix': '_h265',
     },
@@ -40,6 +42,7 @@ CODEC_CONFIGS = {
         'name': 'H.264/AVC',
         'container': 'mp4',
         'gpu_encoder': 'h264_nvenc',
+        'gpu_encoders': {'nvidia': 'h264_nvenc', 'amd': 'h264_amf', 'intel': 'h264_qsv'},
         'cpu_encoder': 'libx264',
         'file_suffix': '_h264',
     },
@@ -59,6 +62,14 @@ CODEC_CONFIGS = {
     },
 }
 
+# Hardware decoder used for movie inputs when encoding on each GPU vendor. -hwaccel qsv only works
+# with the *_qsv decoders and fails outright without a QSV device, so Intel uses auto like AMD
+GPU_HWACCEL = {
+    'nvidia': 'cuda',
+    'amd': 'auto',
+    'intel': 'auto',
+}
+
 # ProRes profile mapping
 PRORES_PROFILES = {
     'proxy': 0,
@@ -69,6 +80,9 @@ PRORES_PROFILES = {
     '4444xq': 5,
 }
 
+# Source codecs where every frame is a keyframe, so frame-based chunk boundaries are already aligned
+INTRA_ONLY_CODECS = {'prores', 'hap', 'dnxhd', 'mjpeg', 'cfhd', 'v210', 'rawvideo', 'ffv1', 'qtrle', 'png', 'tiff'}
+
 
 def GetDeadlineEventListener():
     return AutoFFmpeg()
@@ -326,8 +340,20 @@ def detectEXRFrameRateFromSequence(inputFile):
         return None
 
 
+# ffprobe path found by findFFprobe, kept for the life of the event plugin process
+_ffprobe_path = None
+
+
 def findFFprobe():
-    """Find ffprobe executable in common locations."""
+    """
+    Find ffprobe executable in common locations.
+    A successful lookup is remembered, so each job's probes don't respawn ffprobe -version
+    for every candidate path; a failed lookup is retried next time.
+    """
+    global _ffprobe_path
+    if _ffprobe_path:
+        return _ffprobe_path
+
     ffprobe_paths = [
         'ffprobe',
         'ffprobe.exe',
@@ -339,8 +365,11 @@ def findFFprobe():
 
     for path in ffprobe_paths:
         try:
-            result = subprocess.run([path, '-version'], capture_output=True, timeout=5)
+            # Only the exit code matters; don't buffer the version banner
+            result = subprocess.run([path, '-version'], stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=5)
             if result.returncode == 0:
+                _ffprobe_path = path
                 return path
         except:
             continue
@@ -358,7 +387,7 @@ def _extractTimecodeFromFrame(ffprobe_cmd, file_path):
             file_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=15)
 
         if result.returncode == 0:
             data = json.loads(result.stdout)
@@ -401,7 +430,7 @@ def detectVideoProperties(inputFile):
             inputFile
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=15)
 
         if result.returncode != 0:
             return None
@@ -420,10 +449,11 @@ def detectVideoProperties(inputFile):
             'height': video_stream.get('height', 0),
             'pix_fmt': video_stream.get('pix_fmt', ''),
             'frame_rate': None,
-            'duration': format_info.get('duration', '0')
+            'duration': format_info.get('duration', '0'),
+            'codec_name': video_stream.get('codec_name', '').lower(),
         }
 
-        codec_name = video_stream.get('codec_name', '').lower()
+        codec_name = properties['codec_name']
         is_image_sequence = codec_name in ['exr', 'png', 'jpg', 'jpeg', 'tiff', 'tga', 'bmp']
 
         if not is_image_sequence:
@@ -454,6 +484,80 @@ def detectVideoProperties(inputFile):
         return None
 
 
+def snapChunksToKeyframes(keyframes, fps, chunks):
+    """
+    Move each chunk's start forward to the next keyframe and return (startSeconds, durationSeconds)
+    per chunk, or None if the keyframes are too sparse for the chunk count.
+
+    >>> snapChunksToKeyframes([0.0, 1.0, 2.0, 3.0, 4.0], 10.0, [(1, 13), (14, 26), (27, 40)])
+    [(0.0, 2.0), (2.0, 1.0), (3.0, 1.0)]
+    >>> snapChunksToKeyframes([0.0, 10.0], 10.0, [(1, 20), (21, 40)]) is None
+    True
+    """
+    # Seek times are relative to the start of the stream
+    keyframes = sorted(keyframes)
+    keyframes = [t - keyframes[0] for t in keyframes]
+
+    first_frame = chunks[0][0]
+    starts = []
+    for start_frame, _ in chunks:
+        ideal_start = (start_frame - first_frame) / fps
+        # Half a frame of tolerance so a keyframe exactly on the ideal start is kept
+        index = bisect.bisect_left(keyframes, ideal_start - 0.5 / fps)
+        if index >= len(keyframes) or (starts and keyframes[index] <= starts[-1]):
+            return None
+        starts.append(keyframes[index])
+
+    last_end = (chunks[-1][1] - first_frame + 1) / fps
+    if starts[-1] >= last_end:
+        return None
+    ends = starts[1:] + [last_end]
+    return [(start, end - start) for start, end in zip(starts, ends)]
+
+
+def planKeyframeBoundaries(inputFile, chunks):
+    """
+    Probe a movie file's keyframes once and snap the chunk starts to them.
+    Returns the plan from snapChunksToKeyframes, or None to keep frame-based chunking.
+    Only packet flags are read, so nothing is decoded.
+    """
+    ffprobe_cmd = findFFprobe()
+    if not ffprobe_cmd:
+        return None
+
+    cmd = [
+        ffprobe_cmd,
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=avg_frame_rate:packet=pts_time,flags',
+        '-of', 'json',
+        inputFile
+    ]
+
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=300)
+        if result.returncode != 0:
+            return None
+        data = json.loads(result.stdout)
+        num, den = data['streams'][0]['avg_frame_rate'].split('/')
+        fps = float(num) / float(den)
+    except (OSError, subprocess.TimeoutExpired, ValueError, KeyError, IndexError, ZeroDivisionError):
+        return None
+
+    keyframes = []
+    for packet in data.get('packets', []):
+        if 'K' not in packet.get('flags', ''):
+            continue
+        try:
+            keyframes.append(float(packet['pts_time']))
+        except (KeyError, ValueError):
+            continue
+    if not keyframes:
+        return None
+
+    return snapChunksToKeyframes(keyframes, fps, chunks)
+
+
 def calculateOptimalResolution(width, height, max_width=8192, max_height=4320):
     """
     Calculate optimal resolution for encoding.
@@ -475,12 +579,30 @@ def calculateOptimalResolution(width, height, max_width=8192, max_height=4320):
     return new_width, new_height
 
 
-def buildH265Args(properties, target_width, target_height, enable_gpu=True, crf=23):
-    """Build H.265 encoding arguments."""
-    args = []
+def buildGPUEncoderArgs(codec, gpu_vendor='nvidia', crf=23, b_ref_mode='disabled'):
+    """Build the hardware encoder arguments for H.264/H.265 on the given GPU vendor.
 
-    if enable_gpu:
-        args.extend(['-c:v', 'hevc_nvenc'])
+    >>> buildGPUEncoderArgs('h265', 'amd', 22)
+    ['-c:v', 'hevc_amf', '-quality', 'balanced', '-rc', 'cqp', '-qp_i', '22', '-qp_p', '24']
+    >>> buildGPUEncoderArgs('h264', 'intel', 23)
+    ['-c:v', 'h264_qsv', '-preset', 'medium', '-global_quality', '23']
+    """
+    encoders = CODEC_CONFIGS[codec]['gpu_encoders']
+    encoder = encoders.get(gpu_vendor, encoders['nvidia'])
+    args = ['-c:v', encoder]
+
+    if gpu_vendor == 'amd':
+        # AMF has no constant-quality VBR mode; constant QP with P-frames slightly coarser is closest
+        args.extend(['-quality', 'balanced'])
+        args.extend(['-rc', 'cqp'])
+        args.extend(['-qp_i', str(crf)])
+        args.extend(['-qp_p', str(crf + 2)])
+        if codec == 'h264':
+            args.extend(['-qp_b', str(crf + 4)])
+    elif gpu_vendor == 'intel':
+        args.extend(['-preset', 'medium'])
+        args.extend(['-global_quality', str(crf)])
+    else:
         args.extend(['-preset', 'p4'])
         args.extend(['-tune', 'hq'])
         args.extend(['-rc', 'vbr'])
@@ -489,8 +611,23 @@ def buildH265Args(properties, target_width, target_height, enable_gpu=True, crf=
         args.extend(['-maxrate', '50M'])
         args.extend(['-bufsize', '100M'])
         args.extend(['-bf', '3'])
+        # B-frames as references need Turing or newer; 'disabled' keeps older cards working
+        if b_ref_mode and b_ref_mode != 'disabled':
+            args.extend(['-b_ref_mode', b_ref_mode])
+        args.extend(['-rc-lookahead', '20'])
         args.extend(['-spatial_aq', '1'])
         args.extend(['-temporal_aq', '1'])
+
+    return args
+
+
+def buildH265Args(properties, target_width, target_height, enable_gpu=True, crf=23, b_ref_mode='disabled',
+                  gpu_vendor='nvidia'):
+    """Build H.265 encoding arguments."""
+    args = []
+
+    if enable_gpu:
+        args.extend(buildGPUEncoderArgs('h265', gpu_vendor, crf, b_ref_mode))
     else:
         args.extend(['-c:v', 'libx265'])
         args.extend(['-preset', 'medium'])
@@ -517,22 +654,13 @@ def buildH265Args(properties, target_width, target_height, enable_gpu=True, crf=
     return args
 
 
-def buildH264Args(properties, target_width, target_height, enable_gpu=True, crf=23):
+def buildH264Args(properties, target_width, target_height, enable_gpu=True, crf=23, b_ref_mode='disabled',
+                  gpu_vendor='nvidia'):
     """Build H.264 encoding arguments."""
     args = []
 
     if enable_gpu:
-        args.extend(['-c:v', 'h264_nvenc'])
-        args.extend(['-preset', 'p4'])
-        args.extend(['-tune', 'hq'])
-        args.extend(['-rc', 'vbr'])
-        args.extend(['-cq', str(crf)])
-        args.extend(['-b:v', '0'])
-        args.extend(['-maxrate', '50M'])
-        args.extend(['-bufsize', '100M'])
-        args.extend(['-bf', '3'])
-        args.extend(['-spatial_aq', '1'])
-        args.extend(['-temporal_aq', '1'])
+        args.extend(buildGPUEncoderArgs('h264', gpu_vendor, crf, b_ref_mode))
     else:
         args.extend(['-c:v', 'libx264'])
         args.extend(['-preset', 'medium'])
@@ -624,19 +752,19 @@ def buildHAPArgs(properties, target_width, target_height, variant=None):
 
 
 def buildCodecArgs(codec, properties, target_width, target_height, enable_gpu=True, crf=23,
-                   prores_profile='422hq', hap_variant=None):
+                   prores_profile='422hq', hap_variant=None, b_ref_mode='disabled', gpu_vendor='nvidia'):
     """Build encoding arguments for specified codec."""
     if codec == 'h265':
-        return buildH265Args(properties, target_width, target_height, enable_gpu, crf)
+        return buildH265Args(properties, target_width, target_height, enable_gpu, crf, b_ref_mode, gpu_vendor)
     elif codec == 'h264':
-        return buildH264Args(properties, target_width, target_height, enable_gpu, crf)
+        return buildH264Args(properties, target_width, target_height, enable_gpu, crf, b_ref_mode, gpu_vendor)
     elif codec == 'prores':
         return buildProResArgs(properties, target_width, target_height, prores_profile)
     elif codec == 'hap':
         return buildHAPArgs(properties, target_width, target_height, hap_variant)
     else:
         # Default to H.265
-        return buildH265Args(properties, target_width, target_height, enable_gpu, crf)
+        return buildH265Args(properties, target_width, target_height, enable_gpu, crf, b_ref_mode, gpu_vendor)
 
 
 class AutoFFmpeg(DeadlineEventListener):
@@ -894,6 +1022,8 @@ class AutoFFmpeg(DeadlineEventListener):
         else:
             crf = self.GetConfigEntryWithDefault('CRF', 23, int)
         prores_profile = self.GetConfigEntryWithDefault('ProResProfile', '422hq')
+        b_ref_mode = self.GetConfigEntryWithDefault('NVENCBRefMode', 'disabled')
+        gpu_vendor = self.GetConfigEntryWithDefault('GPUVendor', 'nvidia').lower()
         hap_variant = None
 
         # Override from filename tokens
@@ -907,7 +1037,7 @@ class AutoFFmpeg(DeadlineEventListener):
 
         optimal_args = buildCodecArgs(
             codec, properties, target_width, target_height,
-            enable_gpu, crf, prores_profile, hap_variant
+            enable_gpu, crf, prores_profile, hap_variant, b_ref_mode, gpu_vendor
         )
 
         # Get custom output args
@@ -950,6 +1080,15 @@ class AutoFFmpeg(DeadlineEventListener):
                 self.LogWarning('Frame rate could not be determined. Please set FrameRateOverride or use [fps] token.')
                 return
 
+        # Movie inputs can be decoded on the GPU (NVDEC, or whatever -hwaccel auto finds) when it also
+        # does the encoding. Frames still come back to system memory for the scale/pad filters, but the
+        # CPU no longer decodes the source. Image sequences are left alone: hardware decoders cannot
+        # decode EXR/PNG/TIFF
+        if enable_gpu and codec in ('h264', 'h265') and not isSequence(inputFileName):
+            hwaccel = GPU_HWACCEL.get(gpu_vendor, 'cuda')
+            input_args = f'-hwaccel {hwaccel} {input_args}'.strip()
+            self.LogInfo('Using -hwaccel {} hardware decoding for movie input'.format(hwaccel))
+
         # Audio detection (priority: ExtraInfo > tokens > config)
         if extrainfo_settings and extrainfo_settings.get('audio'):
             enable_audio = extrainfo_settings['audio'].lower() == 'true'
@@ -1029,6 +1168,19 @@ class AutoFFmpeg(DeadlineEventListener):
                 self.LogInfo('=== TASK-BASED PARALLEL ENCODING ===')
                 self.LogInfo('Total frames: {}, Chunks: {}'.format(len(job.JobFramesList), len(chunks)))
 
+                # Movie inputs are cut on source keyframes, probed once here (on the mapped sample file) so
+                # the chunk tasks don't each scan the whole file. Sequences and intra-only codecs are
+                # keyframes on every frame and keep frame-based chunks
+                keyframe_plan = None
+                source_codec = properties.get('codec_name', '') if properties else ''
+                if not isSequence(inputFileName) and source_codec not in INTRA_ONLY_CODECS:
+                    keyframe_plan = planKeyframeBoundaries(sampleFile, chunks)
+                    if keyframe_plan:
+                        self.LogInfo('Keyframe-aligned chunk starts: {}'.format(
+                            ', '.join('{:.3f}s'.format(start_time) for start_time, _ in keyframe_plan)))
+                    else:
+                        self.LogInfo('No keyframe plan for movie input - using frame-based chunk boundaries')
+
                 createTaskBasedEncodingJob(
                     job,
                     inputFileName=inputFileName,
@@ -1039,7 +1191,8 @@ class AutoFFmpeg(DeadlineEventListener):
                     priority=priority,
                     audioFile=audio_file,
                     keepChunks=keep_chunks,
-                    concurrentTasks=concurrent_tasks
+                    concurrentTasks=concurrent_tasks,
+                    keyframePlan=keyframe_plan
                 )
                 self.LogInfo('Submitted task-based encoding job: {}'.format(outputFileName))
                 return
@@ -1315,6 +1468,36 @@ def commandLineSubmit(executable, plugin, info, aux=None):
     return jobId
 
 
+def getDeadlineCommand():
+    """Path to the deadlinecommand executable in the client bin directory."""
+    deadlineBin = ClientUtils.GetBinDirectory()
+    if os.name == 'nt':
+        return os.path.join(deadlineBin, "deadlinecommand.exe")
+    return os.path.join(deadlineBin, "deadlinecommand")
+
+
+def submitJob(job, prefix, jobInfo, pluginInfo):
+    """Write the job/plugin info files, submit them and clean up.
+
+    The files are named ``<prefix>_<jobId>.job`` and ``<prefix>_plugin_<jobId>.job``
+    in the Deadline temp directory. Returns the new job's ID.
+    """
+    tempPath = ClientUtils.GetDeadlineTempPath()
+    os.makedirs(tempPath, exist_ok=True)
+    jobInfoFile = os.path.join(tempPath, "{}_{}.job".format(prefix, job.JobId))
+    pluginInfoFile = os.path.join(tempPath, "{}_plugin_{}.job".format(prefix, job.JobId))
+
+    for p, i in ((jobInfoFile, jobInfo), (pluginInfoFile, pluginInfo)):
+        with open(p, 'w') as f:
+            f.write(''.join('{}={}\n'.format(k, v) for k, v in i.items()))
+
+    try:
+        return commandLineSubmit(getDeadlineCommand(), pluginInfoFile, jobInfoFile)
+    finally:
+        os.remove(jobInfoFile)
+        os.remove(pluginInfoFile)
+
+
 def createFFmpegJob(job, inputFileName, outputFileName, outputArgs='', inputArgs='',
                     priority=50, audioFile=None):
     """Create a single FFmpeg encoding job."""
@@ -1370,50 +1553,35 @@ def createFFmpegJob(job, inputFileName, outputFileName, outputArgs='', inputArgs
         pluginInfo['InputArgs1'] = ''  # No special args for audio
         pluginInfo['ReplacePadding1'] = False
 
-    jobInfoFile = os.path.join(
-        ClientUtils.GetDeadlineTempPath(), "ffmpeg_event_{0}.job".format(job.JobId)
-    )
-    pluginInfoFile = os.path.join(
-        ClientUtils.GetDeadlineTempPath(), "ffmpeg_event_plugin_{0}.job".format(job.JobId)
-    )
+    return submitJob(job, "ffmpeg_event", jobInfo, pluginInfo)
 
-    if not os.path.exists(ClientUtils.GetDeadlineTempPath()):
-        os.makedirs(ClientUtils.GetDeadlineTempPath())
-
-    for p, i in ((jobInfoFile, jobInfo), (pluginInfoFile, pluginInfo)):
-        with open(p, 'w') as f:
-            for k, v in i.items():
-                f.write('{}={}\n'.format(k, v))
-
-    deadlineBin = ClientUtils.GetBinDirectory()
-    if os.name == 'nt':
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand.exe")
-    else:
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand")
 
-    jobId = commandLineSubmit(deadlineCommand, pluginInfoFile, jobInfoFile)
-    os.remove(jobInfoFile)
-    os.remove(pluginInfoFile)
-    return jobId
+def calculateChunks(frameList, chunkSize, minChunks=2):
+    """Calculate chunk ranges for parallel encoding.
 
+    Frames are split as evenly as possible: chunk sizes differ by at most one frame.
 
-def calculateChunks(frameList, chunkSize, minChunks=2):
-    """Calculate chunk ranges for parallel encoding."""
+    >>> calculateChunks(list(range(1, 11)), 4)
+    [(1, 4), (5, 7), (8, 10)]
+    >>> calculateChunks(list(range(1, 11)), 3)
+    [(1, 3), (4, 6), (7, 8), (9, 10)]
+    >>> calculateChunks(list(range(1, 5)), 3) is None
+    True
+    """
     if not frameList or len(frameList) < chunkSize * minChunks:
         return None
 
     frameList = sorted(frameList)
     totalFrames = len(frameList)
     numChunks = max(minChunks, (totalFrames + chunkSize - 1) // chunkSize)
-    actualChunkSize = (totalFrames + numChunks - 1) // numChunks
+    baseSize, extra = divmod(totalFrames, numChunks)
 
     chunks = []
+    startIdx = 0
     for i in range(numChunks):
-        startIdx = i * actualChunkSize
-        endIdx = min((i + 1) * actualChunkSize, totalFrames)
-
-        if startIdx < totalFrames:
-            chunks.append((frameList[startIdx], frameList[endIdx - 1]))
+        endIdx = startIdx + baseSize + (1 if i < extra else 0)
+        chunks.append((frameList[startIdx], frameList[endIdx - 1]))
+        startIdx = endIdx
 
     return chunks
 
@@ -1495,43 +1663,19 @@ def createConcatJob(job, chunkFiles, finalOutputFile, priority, keepChunks=False
         'OutputArgs': concatArgs,
     }
 
-    jobInfoFile = os.path.join(
-        ClientUtils.GetDeadlineTempPath(), "ffmpeg_concat_{}.job".format(job.JobId)
-    )
-    pluginInfoFile = os.path.join(
-        ClientUtils.GetDeadlineTempPath(), "ffmpeg_concat_plugin_{}.job".format(job.JobId)
-    )
-
-    if not os.path.exists(ClientUtils.GetDeadlineTempPath()):
-        os.makedirs(ClientUtils.GetDeadlineTempPath())
-
-    for p, i in ((jobInfoFile, jobInfo), (pluginInfoFile, pluginInfo)):
-        with open(p, 'w') as f:
-            for k, v in i.items():
-                f.write(f'{k}={v}\n')
-
-    deadlineBin = ClientUtils.GetBinDirectory()
-    if os.name == 'nt':
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand.exe")
-    else:
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand")
-
-    concatJobId = commandLineSubmit(deadlineCommand, pluginInfoFile, jobInfoFile)
-
-    os.remove(jobInfoFile)
-    os.remove(pluginInfoFile)
-
-    return concatJobId
+    return submitJob(job, "ffmpeg_concat", jobInfo, pluginInfo)
 
 
 def createTaskBasedEncodingJob(job, inputFileName, outputFileName, outputArgs, inputArgs,
-                               chunks, priority, audioFile=None, keepChunks=False, concurrentTasks=3):
+                               chunks, priority, audioFile=None, keepChunks=False, concurrentTasks=3,
+                               keyframePlan=None):
     """
     Create TWO separate jobs for parallel encoding:
     1. Encoding Job: Multiple tasks to encode chunks in parallel
     2. Concat Job: Single task to concatenate chunks (depends on encoding job)
 
     This ensures concat doesn't start until all chunks are FULLY written to disk.
+    keyframePlan, from planKeyframeBoundaries, gives each chunk a keyframe-aligned start time and duration.
     """
     pattern = r"(?P<head>.+?)(?P<padding>#+)(?P<tail>\.\w+$)"
     padding = re.search(pattern, inputFileName)
@@ -1594,31 +1738,15 @@ def createTaskBasedEncodingJob(job, inputFileName, outputFileName, outputArgs, i
         encodingPluginInfo[f'ChunkEnd{idx}'] = endFrame
         encodingPluginInfo[f'ChunkFrames{idx}'] = endFrame - startFrame + 1
 
-    # Submit encoding job
-    tempPath = ClientUtils.GetDeadlineTempPath()
-    if not os.path.exists(tempPath):
-        os.makedirs(tempPath)
-
-    encodingJobInfoFile = os.path.join(tempPath, "ffmpeg_encode_{}.job".format(job.JobId))
-    encodingPluginInfoFile = os.path.join(tempPath, "ffmpeg_encode_plugin_{}.job".format(job.JobId))
+    if keyframePlan:
+        for idx, (startTime, duration) in enumerate(keyframePlan):
+            encodingPluginInfo[f'ChunkStartTime{idx}'] = '{:.6f}'.format(startTime)
+            encodingPluginInfo[f'ChunkDuration{idx}'] = '{:.6f}'.format(duration)
 
-    for p, i in ((encodingJobInfoFile, encodingJobInfo), (encodingPluginInfoFile, encodingPluginInfo)):
-        with open(p, 'w') as f:
-            for k, v in i.items():
-                f.write('{}={}\n'.format(k, v))
-
-    deadlineBin = ClientUtils.GetBinDirectory()
-    if os.name == 'nt':
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand.exe")
-    else:
-        deadlineCommand = os.path.join(deadlineBin, "deadlinecommand")
-
-    encodingJobId = commandLineSubmit(deadlineCommand, encodingPluginInfoFile, encodingJobInfoFile)
+    # Submit encoding job
+    encodingJobId = submitJob(job, "ffmpeg_encode", encodingJobInfo, encodingPluginInfo)
     print("[AutoFFmpeg] Submitted encoding job: {}".format(encodingJobId))
 
-    os.remove(encodingJobInfoFile)
-    os.remove(encodingPluginInfoFile)
-
     # ==================================================
     # JOB 2: Concat Job (depends on encoding job)
     # ==================================================
@@ -1657,25 +1785,14 @@ def createTaskBasedEncodingJob(job, inputFileName, outputFileName, outputArgs, i
     if audioFile:
         concatPluginInfo['AudioFile'] = audioFile.replace('\\', '/')
 
-    # Submit concat job
-    concatJobInfoFile = os.path.join(tempPath, "ffmpeg_concat_{}.job".format(job.JobId))
-    concatPluginInfoFile = os.path.join(tempPath, "ffmpeg_concat_plugin_{}.job".format(job.JobId))
-
-    for p, i in ((concatJobInfoFile, concatJobInfo), (concatPluginInfoFile, concatPluginInfo)):
-        with open(p, 'w') as f:
-            for k, v in i.items():
-                f.write('{}={}\n'.format(k, v))
-
     # Debug: Log the job dependency setting
     print("[AutoFFmpeg] Concat job info - JobDependencies={}".format(concatJobInfo.get('JobDependencies', 'NOT SET')))
 
-    concatJobId = commandLineSubmit(deadlineCommand, concatPluginInfoFile, concatJobInfoFile)
+    # Submit concat job
+    concatJobId = submitJob(job, "ffmpeg_concat", concatJobInfo, concatPluginInfo)
     print("[AutoFFmpeg] Submitted concat job: {}".format(concatJobId))
     print("[AutoFFmpeg] Concat job depends on encoding job: {}".format(encodingJobId))
 
-    os.remove(concatJobInfoFile)
-    os.remove(concatPluginInfoFile)
-
     return concatJobId  # Return concat job ID as the final job
 
 
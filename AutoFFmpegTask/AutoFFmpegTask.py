@@ -12,10 +12,288 @@ from __future__ import print_function, division, absolute_import
 from Deadline.Plugins import DeadlinePlugin
 from Deadline.Scripting import RepositoryUtils
 import os
+import sys
 import subprocess
 import re
 import time
 import shutil
+import json
+import functools
+import errno
+import ctypes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows
+import select
+import struct
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Frame padding in a sequence path (%04d or ####)
+SEQUENCE_PATTERN = re.compile(r'%0?\d*d|#+')
+
+# FFmpeg progress line, e.g. "frame=  120 fps= 48 q=28.0 size=..."
+PROGRESS_PATTERN = re.compile(r'frame=\s*(\d+)\s+fps=\s*([\d.]+)')
+
+# Encode speed relative to realtime, e.g. "speed=1.52x"
+SPEED_PATTERN = re.compile(r'speed=\s*([\d.]+)x')
+
+# Output timestamp of a progress line, e.g. "time=00:01:02.50"
+TIME_PATTERN = re.compile(r'time=\s*(\d+):(\d+):([\d.]+)')
+
+# Number of per-interval speed samples kept per task; older samples are dropped
+SPEED_SAMPLE_LIMIT = 600
+
+# Hardware encoders do their own threading, so -threads only matters for CPU codecs
+HW_ENCODER_PATTERN = re.compile(r'-c(?::v)?\s+\w+_(?:nvenc|amf|qsv)\b')
+
+# faststart rewrites the whole file to move the moov atom; chunks are only intermediates and
+# the concat pass applies it to the final output
+FASTSTART_PATTERN = re.compile(r'(?:^|\s)-movflags\s+\+?faststart(?=\s|$)')
+
+# Minimum seconds between progress lines written to the task log
+PROGRESS_LOG_INTERVAL = 1.0
+
+# Fraction of the log interval a progress line may arrive early and still be logged, so jitter in
+# FFmpeg's stats timer doesn't drop every other line when the interval matches StatsPeriod
+PROGRESS_LOG_SLACK = 0.9
+
+# Longest single wait between delete attempts; bounds the delay for closes inotify cannot see
+CHUNK_RELEASE_POLL = 0.25
+
+# Default cap on the total time spent waiting for locked chunks to become deletable (ChunkDeleteTimeout)
+CHUNK_DELETE_TIMEOUT = 60.0
+
+# inotify(7) close events; IN_CLOSE_NOWRITE matters too since the concat only reads the chunks
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+INOTIFY_EVENT = struct.Struct('iIII')
+
+# ioctl_ficlone(2): share the source's extents copy-on-write (btrfs, XFS)
+FICLONE = 0x40049409
+
+
+def findSequenceFiles(sourcePattern, startFrame=None, endFrame=None):
+    """List the files of a %0Nd / #### sequence, optionally limited to a frame range"""
+    # One directory listing matched against a regex, rather than a glob (brackets need escaping)
+    # followed by a second filtering pass
+    directory, filename = os.path.split(sourcePattern)
+    padding = SEQUENCE_PATTERN.search(filename)
+    if not padding:
+        return [sourcePattern] if os.path.isfile(sourcePattern) else []
+
+    framePattern = re.compile(
+        re.escape(filename[:padding.start()]) + r'(\d+)' + re.escape(filename[padding.end():]) + '$',
+        re.IGNORECASE if os.name == 'nt' else 0)
+    checkRange = startFrame is not None and endFrame is not None
+
+    files = []
+    try:
+        entries = os.scandir(directory or '.')
+    except OSError:
+        return []
+    with entries:
+        for entry in entries:
+            match = framePattern.match(entry.name)
+            if not match:
+                continue
+            if checkRange and not startFrame <= int(match.group(1)) <= endFrame:
+                continue
+            files.append(entry.path)
+    return sorted(files)
+
+
+def fastCopy(src, dst):
+    """Copy data and metadata like shutil.copy2, letting the OS move the bytes where it can"""
+    srcStat = os.stat(src)
+    try:
+        dstStat = os.stat(dst)
+    except OSError:
+        dstStat = None
+    if dstStat is not None:
+        if os.path.samestat(srcStat, dstStat):
+            return
+        if dstStat.st_nlink > 1:
+            # Writing through a hardlink would also change every other name for the file
+            os.remove(dst)
+
+    try:
+        sameDevice = srcStat.st_dev == os.stat(os.path.dirname(dst) or '.').st_dev
+    except OSError:
+        sameDevice = False
+    # On the same filesystem nothing is copied: dst becomes a hardlink (or a reflink below). The files
+    # are only ever read or replaced whole here, so sharing their data blocks is safe
+    if sameDevice:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+
+    if os.name == 'nt':
+        # CopyFileW also carries over timestamps and attributes
+        if ctypes.windll.kernel32.CopyFileW(src, dst, False):
+            return
+    elif hasattr(os, 'copy_file_range'):
+        # Kernel-side copy: server-side on NFS/SMB, reflinked on btrfs/XFS
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                cloned = False
+                if sameDevice:
+                    try:
+                        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                        cloned = True
+                    except OSError:
+                        pass
+                while not cloned and os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+            shutil.copystat(src, dst)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    shutil.copy2(src, dst)
+
+
+def prefetchFile(path):
+    """Start sequential readahead on path so its pages are warm by the time FFmpeg opens it"""
+    # posix_fadvise does not exist on Windows
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        # Advice values are not flags, so each one needs its own call
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def quoteArgument(value):
+    """Quote a path for the FFmpeg command line"""
+    # Deadline hands the argument string to the OS as-is and Windows only understands double
+    # quotes, so shlex.quote is not an option
+    return '"{}"'.format(value)
+
+
+def joinArguments(parts):
+    """Join argument fragments with single spaces, skipping empty ones (e.g. blank InputArgs)"""
+    return " ".join(part for part in parts if part)
+
+
+def tryDelete(directory, name, dirFd=None):
+    """Unlink one file without raising; returns (name, ok, error). A missing file counts as deleted."""
+    try:
+        if dirFd is not None:
+            os.unlink(name, dir_fd=dirFd)
+        else:
+            os.remove(os.path.join(directory, name))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        return name, False, e
+    return name, True, None
+
+
+def unlinkBatch(directory, names, executor=None):
+    """Delete every name in directory in one pass; returns {name: error} for the files left behind"""
+    # Unlinking relative to one open directory handle resolves the directory path once, not per file
+    dirFd = None
+    if os.unlink in os.supports_dir_fd:
+        try:
+            dirFd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            dirFd = None
+    try:
+        deleteOne = lambda name: tryDelete(directory, name, dirFd)
+        # Spread over the executor's threads so the round trips overlap on network shares
+        if executor is not None and len(names) > 1:
+            results = list(executor.map(deleteOne, names))
+        else:
+            results = [deleteOne(name) for name in names]
+    finally:
+        if dirFd is not None:
+            os.close(dirFd)
+    return {name: error for name, ok, error in results if not ok}
+
+
+def setThreadAffinities(cores):
+    """Apply a CPU affinity to every thread of this process"""
+    # sched_setaffinity only sets the one thread it names, and the thread that ends up spawning FFmpeg
+    # (which inherits its mask) is Deadline's, not necessarily the one running the plugin callbacks
+    try:
+        threadIds = [int(tid) for tid in os.listdir('/proc/self/task')]
+    except OSError:
+        threadIds = [0]
+    for threadId in threadIds:
+        try:
+            os.sched_setaffinity(threadId, cores)
+        except ProcessLookupError:
+            # The thread exited since the listing
+            continue
+
+
+class CloseWatcher(object):
+    """Wake up as soon as a file in a directory is closed, instead of sleeping a fixed interval"""
+
+    # inotify on Linux only. Elsewhere, and for closes by other hosts on a network share (which
+    # inotify never sees), wait() is a plain sleep, so callers keep each wait short and re-check
+
+    def __init__(self, directory):
+        self.fd = None
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_CLOSE_NOWRITE) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+        except (OSError, AttributeError):
+            self.fd = None
+
+    def wait(self, timeout, names=None):
+        """Block until one of names (any file if None) is closed or timeout passes; returns the names closed"""
+        if self.fd is None:
+            time.sleep(timeout)
+            return set()
+        deadline = time.monotonic() + max(timeout, 0)
+        closed = set()
+        while True:
+            readable, _, _ = select.select([self.fd], [], [], max(deadline - time.monotonic(), 0))
+            if not readable:
+                return closed
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                _, _, _, nameLen = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset:offset + nameLen].rstrip(b'\0'))
+                offset += nameLen
+                # An empty name is the watched directory itself, e.g. the dir_fd unlinkBatch opens
+                if name:
+                    closed.add(name)
+            if closed and (names is None or not closed.isdisjoint(names)):
+                return closed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
 
 
 def GetDeadlinePlugin():
@@ -27,6 +305,10 @@ def CleanupDeadlinePlugin(plugin):
 
 
 class AutoFFmpegTaskPlugin(DeadlinePlugin):
+    # (FFMPEG_PATH, FFmpegExecutable config, resolved path) from the last successful lookup.
+    # Shared by every task on this Worker; the binary does not move between tasks.
+    _ffmpegCache = None
+
     def __init__(self):
         super(AutoFFmpegTaskPlugin, self).__init__()
         self.InitializeProcessCallback += self.InitializeProcess
@@ -35,19 +317,69 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
         self.PreRenderTasksCallback += self.PreRenderTasks
         self.PostRenderTasksCallback += self.PostRenderTasks
 
+        # Progress throttling state, reset at the start of every task
+        self.lastProgressTime = 0.0
+        self.lastProgress = None
+        self.statsPeriod = 1.0
+        self.progressLogInterval = PROGRESS_LOG_INTERVAL * PROGRESS_LOG_SLACK
+
+        # Speed timeline: (FFmpeg elapsed, output seconds) of the previous progress line and per-interval speeds
+        self.lastTimeSample = None
+        self.speedSamples = deque(maxlen=SPEED_SAMPLE_LIMIT)
+
+        # When PreRenderTasks started, for the task summary
+        self.taskStartTime = time.monotonic()
+
+        # Cores this process could use before any pin (read on first use), and whether it is pinned now
+        self.baseCores = None
+        self.pinnedCores = False
+
+        # Thread pool for file copies and deletes, created on first use and kept across tasks
+        self.ioExecutor = None
+
     def Cleanup(self):
+        if self.ioExecutor is not None:
+            self.ioExecutor.shutdown(wait=True)
+            self.ioExecutor = None
+
         del self.InitializeProcessCallback
         del self.RenderExecutableCallback
         del self.RenderArgumentCallback
         del self.PreRenderTasksCallback
         del self.PostRenderTasksCallback
 
+    def GetIOExecutor(self):
+        """Shared thread pool for overlapping file operations on network shares"""
+        # Deadline keeps the plugin loaded between tasks of a job, so the threads start once, not per task
+        if self.ioExecutor is None:
+            ioWorkers = max(1, int(self.GetConfigEntryWithDefault("CopyWorkers", "16")))
+            self.ioExecutor = ThreadPoolExecutor(max_workers=ioWorkers, thread_name_prefix="AutoFFmpegTaskIO")
+        return self.ioExecutor
+
     def InitializeProcess(self):
         self.SingleFramesOnly = True
         self.StdoutHandling = True
         self.PopupHandling = False
 
+        # Deadline merges FFmpeg's stderr into the process output. Its own regex dispatch picks out
+        # the lines we act on, so everything else never reaches Python
+        self.AddStdoutHandlerCallback(r"^\s*frame=.*").HandleCallback += self.HandleProgress
+        self.AddStdoutHandlerCallback(r"(?i).*\b(error|failed|invalid)\b.*").HandleCallback += self.HandleError
+
     def RenderExecutable(self):
+        cacheKey = (os.environ.get("FFMPEG_PATH"), self.GetConfigEntry("FFmpegExecutable"))
+        cached = AutoFFmpegTaskPlugin._ffmpegCache
+        if cached and cached[:2] == cacheKey and os.path.isfile(cached[2]):
+            self.LogInfo("AutoFFmpegTask: Using FFmpeg found by an earlier task: {}".format(cached[2]))
+            return cached[2]
+
+        ffmpegExe = self.FindRenderExecutable()
+        if ffmpegExe:
+            AutoFFmpegTaskPlugin._ffmpegCache = cacheKey + (ffmpegExe,)
+        return ffmpegExe
+
+    def FindRenderExecutable(self):
+        """Search the FFMPEG_PATH variable, plugin config, common install paths and PATH for FFmpeg"""
         # Priority 1: Check environment variable (per-worker configuration)
         envFFmpeg = os.environ.get("FFMPEG_PATH")
         if envFFmpeg:
@@ -114,10 +446,18 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
 
     def PreRenderTasks(self):
         self.LogInfo("AutoFFmpegTask: Starting task {}".format(self.GetCurrentTaskId()))
-
-        # Check if this is an encoding-only or concat-only job
-        isEncodingJob = self.GetPluginInfoEntryWithDefault("IsEncodingJob", "False") == "True"
-        isConcatJob = self.GetPluginInfoEntryWithDefault("IsConcatJob", "False") == "True"
+        self.lastProgressTime = 0.0
+        self.lastProgress = None
+        self.lastTimeSample = None
+        self.speedSamples.clear()
+        self.statsPeriod = self.GetFloatConfigEntry("StatsPeriod", 1.0)
+        self.progressLogInterval = max(PROGRESS_LOG_INTERVAL, self.statsPeriod) * PROGRESS_LOG_SLACK
+        self.taskStartTime = time.monotonic()
+
+        self.LoadJobContext()
+        isEncodingJob = self._cfg['isEncodingJob']
+        isConcatJob = self._cfg['isConcatJob']
+        numChunks = self._cfg['numChunks']
 
         # Check if local rendering is enabled
         enableLocalRendering = self.GetConfigEntryWithDefault("EnableLocalRendering", "False").lower() == "true"
@@ -133,80 +473,196 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
             self.localInputDir = os.path.join(self.localRenderDir, "input")
             self.localOutputDir = os.path.join(self.localRenderDir, "output")
 
-            # Python 2 compatible directory creation
-            if not os.path.exists(self.localInputDir):
-                os.makedirs(self.localInputDir)
-            if not os.path.exists(self.localOutputDir):
-                os.makedirs(self.localOutputDir)
+            # Created once here; the copy helpers assume their destination already exists
+            os.makedirs(self.localInputDir, exist_ok=True)
+            os.makedirs(self.localOutputDir, exist_ok=True)
 
             self.LogInfo("AutoFFmpegTask: Local render directory: {}".format(self.localRenderDir))
         else:
             self.localRenderDir = None
 
+        # Concat is a single sequential stream copy, so staging its inputs locally only doubles the
+        # bytes moved; unless asked to, concat tasks read and write the network paths directly
+        self.stageConcatInputs = enableLocalRendering and \
+            self.GetConfigEntryWithDefault("StageConcatInputs", "False").lower() == "true"
+
+        self.keyframePlan = None
+        self.concatPlan = None
+
+        # The job's shape is fixed for the task, so pick the argument builder once here
+        self.renderArgumentBuilder = self.BuildConcatArguments
+        encodesChunk = False
+
         if isEncodingJob:
-            numChunks = int(self.GetPluginInfoEntry("NumChunks"))
             currentTask = self.GetStartFrame()
             self.LogInfo("AutoFFmpegTask: Encoding chunk {} of {} (encoding job)".format(currentTask + 1, numChunks))
+            self.renderArgumentBuilder = functools.partial(self.BuildChunkArguments, currentTask)
+            self.keyframePlan = self.GetKeyframePlan(currentTask)
+            encodesChunk = True
+
+            inputFile = self._cfg['inputFile']
+            startFrame = int(self.GetPluginInfoEntry("ChunkStart{}".format(currentTask)))
+            endFrame = int(self.GetPluginInfoEntry("ChunkEnd{}".format(currentTask)))
 
             # Copy input files for this chunk to local directory
             if enableLocalRendering:
-                inputFile = self.MapPath(self.GetPluginInfoEntry("InputFile0"))
-                startFrame = int(self.GetPluginInfoEntry("ChunkStart{}".format(currentTask)))
-                endFrame = int(self.GetPluginInfoEntry("ChunkEnd{}".format(currentTask)))
-
                 self.LogInfo("AutoFFmpegTask: Copying chunk {} frames ({}-{}) to local storage".format(
                     currentTask + 1, startFrame, endFrame))
                 self.CopyFilesToLocal(inputFile, self.localInputDir, startFrame, endFrame)
+            elif SEQUENCE_PATTERN.search(os.path.basename(inputFile)):
+                self.PrefetchSequence(inputFile, startFrame, endFrame)
 
         elif isConcatJob:
-            numChunks = int(self.GetPluginInfoEntry("NumChunks"))
             self.LogInfo("AutoFFmpegTask: Concatenating {} chunks (concat job)".format(numChunks))
+            self.concatPlan = self.ScanChunks()
 
             # Copy chunk files to local directory for concat
-            if enableLocalRendering:
-                outputDir = self.MapPath(self.GetPluginInfoEntry("OutputDirectory"))
-                basename = self.GetPluginInfoEntry("Basename")
-                container = self.GetPluginInfoEntry("Container")
-
-                self.LogInfo("AutoFFmpegTask: Copying {} chunk files to local storage".format(numChunks))
-                for i in range(numChunks):
-                    chunkFile = os.path.join(outputDir, "{}_chunk{:03d}.{}".format(basename, i+1, container))
-                    self.CopyFileToLocal(chunkFile, self.localInputDir)
+            if self.stageConcatInputs:
+                self.LogInfo("AutoFFmpegTask: Copying {} chunk files to local storage".format(len(self.concatPlan)))
+                for chunkFilename, chunkFile in zip(self._cfg['chunkNames'], self._cfg['native']):
+                    if chunkFilename in self.concatPlan:
+                        self.CopyFileToLocal(chunkFile, self.localInputDir)
 
                 # Copy audio file if present
-                audioFile = self.GetPluginInfoEntryWithDefault("AudioFile", "")
-                if audioFile:
-                    audioFile = self.MapPath(audioFile)
-                    self.CopyFileToLocal(audioFile, self.localInputDir)
+                if self._cfg['audioFile']:
+                    self.CopyFileToLocal(self._cfg['audioFile'], self.localInputDir)
         else:
             # Legacy: single job with both encoding and concat
-            numChunks = int(self.GetPluginInfoEntry("NumChunks"))
             currentTask = self.GetStartFrame()
             if currentTask < numChunks:
                 self.LogInfo("AutoFFmpegTask: Encoding chunk {} of {}".format(currentTask + 1, numChunks))
+                self.renderArgumentBuilder = functools.partial(self.BuildChunkArguments, currentTask)
+                self.keyframePlan = self.GetKeyframePlan(currentTask)
+                encodesChunk = True
             else:
                 self.LogInfo("AutoFFmpegTask: Concatenating {} chunks".format(numChunks))
+                self.concatPlan = self.ScanChunks()
+
+        # Concurrent CPU encodes get their own block of cores; GPU encodes and concats drop any earlier pin
+        pinCores = encodesChunk and HW_ENCODER_PATTERN.search(self._cfg['outputArgs']) is None and \
+            self.GetConfigEntryWithDefault("PinConcurrentTasks", "False").lower() == "true"
+        self.UpdateCoreAffinity(pinCores)
 
     def RenderArgument(self):
-        # Check if this is an encoding-only or concat-only job
-        isEncodingJob = self.GetPluginInfoEntryWithDefault("IsEncodingJob", "False") == "True"
-        isConcatJob = self.GetPluginInfoEntryWithDefault("IsConcatJob", "False") == "True"
+        # Chunk encode or concat, as chosen by PreRenderTasks for this task
+        return self.renderArgumentBuilder()
+
+    def LoadJobContext(self):
+        """Read the job's plugin info once per task into self._cfg"""
+        # Every GetPluginInfoEntry call crosses into Deadline's managed layer, and the callbacks need the
+        # same values repeatedly. Chunk paths are built here too so the concat list and the cleanup agree
+        outputDir = os.path.normpath(self.MapPath(self.GetPluginInfoEntry("OutputDirectory")))
+        basename = self.GetPluginInfoEntry("Basename")
+        container = self.GetPluginInfoEntry("Container")
+        numChunks = int(self.GetPluginInfoEntry("NumChunks"))
+        chunkNames = ["{}_chunk{:03d}.{}".format(basename, i + 1, container) for i in range(numChunks)]
+        nativeChunks = [os.path.join(outputDir, name) for name in chunkNames]
+        audioFile = self.GetPluginInfoEntryWithDefault("AudioFile", "")
+        self._cfg = {
+            'isEncodingJob': self.GetPluginInfoEntryWithDefault("IsEncodingJob", "False").lower() == "true",
+            'isConcatJob': self.GetPluginInfoEntryWithDefault("IsConcatJob", "False").lower() == "true",
+            'keepChunks': self.GetPluginInfoEntryWithDefault("KeepChunks", "False").lower() == "true",
+            'inputFile': self.MapPath(self.GetPluginInfoEntryWithDefault("InputFile0", "")),
+            'inputArgs': self.GetPluginInfoEntryWithDefault("InputArgs0", ""),
+            'outputArgs': self.GetPluginInfoEntryWithDefault("OutputArgs", ""),
+            'outputFile': self.MapPath(self.GetPluginInfoEntryWithDefault("OutputFile", "")),
+            'audioFile': self.MapPath(audioFile) if audioFile else "",
+            'outputDir': outputDir,
+            'basename': basename,
+            'container': container,
+            'numChunks': numChunks,
+            'chunkNames': chunkNames,
+            'native': nativeChunks,
+            'posix': [path.replace(os.sep, '/') for path in nativeChunks],
+        }
+
+    def ScanChunks(self):
+        """Sizes of the chunks present in the output directory, keyed by file name"""
+        # One directory listing per concat task, shared by the concat list and the cleanup
+        outputDir = self._cfg['outputDir']
+        wanted = set(self._cfg['chunkNames'])
+        try:
+            with os.scandir(outputDir) as entries:
+                return {e.name: e.stat().st_size for e in entries if e.name in wanted and e.is_file()}
+        except OSError as e:
+            self.LogWarning("AutoFFmpegTask: Could not list '{}': {}".format(outputDir, e))
+            return {}
+
+    def GetEncoderThreadCount(self, shareCores=True):
+        """Thread count for the chunk encoder (0 lets FFmpeg use every core)"""
+        limitThreads = self.GetConfigEntryWithDefault("LimitThreadsToCPUAffinity", "True").lower() == "true"
+        # Deadline already pins the process to its affinity cores; match them rather than every machine core
+        if limitThreads and self.OverrideCpuAffinity():
+            return len(self.CpuAffinity())
+        # Concurrent tasks on this Worker each get their share so they don't oversubscribe the machine
+        if limitThreads and shareCores:
+            coreSlot = self.GetCoreSlot()
+            if coreSlot:
+                return len(coreSlot)
+        return 0
+
+    def GetAvailableCores(self):
+        """Cores this process may run on, as inherited from the Worker before any pin of ours"""
+        if self.baseCores is None:
+            if hasattr(os, 'sched_getaffinity'):
+                self.baseCores = sorted(os.sched_getaffinity(0))
+            else:
+                self.baseCores = list(range(os.cpu_count() or 1))
+        return self.baseCores
 
-        if isEncodingJob:
-            # Encoding job: always encode chunks
-            currentTask = self.GetStartFrame()
-            return self.BuildChunkArguments(currentTask)
-        elif isConcatJob:
-            # Concat job: always concatenate
-            return self.BuildConcatArguments()
-        else:
-            # Legacy: single job with both encoding and concat
-            numChunks = int(self.GetPluginInfoEntry("NumChunks"))
-            currentTask = self.GetStartFrame()
-            if currentTask < numChunks:
-                return self.BuildChunkArguments(currentTask)
+    def GetCoreSlot(self):
+        """This task's block of cores when concurrent tasks split the machine, else None"""
+        if self.OverrideCpuAffinity():
+            return None
+        cores = self.GetAvailableCores()
+        concurrentTasks = self.GetJob().JobConcurrentTasks
+        if concurrentTasks <= 1:
+            return None
+        # Worker thread N gets the Nth contiguous run of cores; with more tasks than cores each still gets one
+        coresPerTask = max(1, len(cores) // concurrentTasks)
+        start = (self.GetThreadNumber() % concurrentTasks) * coresPerTask % len(cores)
+        return cores[start:start + coresPerTask]
+
+    def UpdateCoreAffinity(self, pin):
+        """Pin this process, and so the FFmpeg it spawns, to the task's core slot, or undo an earlier pin"""
+        coreSlot = self.GetCoreSlot() if pin else None
+        pinning = coreSlot is not None
+        if not pinning:
+            # The sandbox process outlives the task, so an earlier task's pin has to be undone
+            if not self.pinnedCores:
+                return
+            coreSlot = self.GetAvailableCores()
+
+        try:
+            if hasattr(os, 'sched_setaffinity'):
+                setThreadAffinities(coreSlot)
+            elif os.name == 'nt':
+                mask = sum(1 << core for core in coreSlot)
+                if not ctypes.windll.kernel32.SetProcessAffinityMask(ctypes.c_void_p(-1), ctypes.c_size_t(mask)):
+                    raise ctypes.WinError()
             else:
-                return self.BuildConcatArguments()
+                return
+        except (OSError, ValueError) as e:
+            self.LogWarning("AutoFFmpegTask: Could not set CPU affinity: {}".format(e))
+            return
+
+        self.pinnedCores = pinning
+        self.LogInfo("AutoFFmpegTask: CPU affinity set to cores {}".format(", ".join(str(core) for core in coreSlot)))
+
+    def GetGlobalArguments(self):
+        """Global FFmpeg options: no banner, no stdin polling, progress every StatsPeriod seconds"""
+        # Each of these cuts down the stderr stream Deadline pumps through the stdout handlers line by line
+        args = "-hide_banner -nostdin"
+        if self.statsPeriod > 0:
+            args += " -stats_period {}".format(self.statsPeriod)
+        return args
+
+    def GetFloatConfigEntry(self, key, default):
+        """Float plugin config entry, or default when it is blank or not a number"""
+        try:
+            return float(self.GetConfigEntryWithDefault(key, str(default)))
+        except ValueError:
+            return default
 
     def MapPath(self, path):
         """Map path for current worker using Deadline's path mapping"""
@@ -221,67 +677,72 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
 
         return mappedPath
 
+    def GetKeyframePlan(self, chunkIndex):
+        """Keyframe-aligned (startSeconds, durationSeconds) of this chunk from the plugin info, or None"""
+        # Submitted by the event plugin for movie inputs only; sequences keep frame-based chunking
+        startTime = self.GetPluginInfoEntryWithDefault("ChunkStartTime{}".format(chunkIndex), "")
+        duration = self.GetPluginInfoEntryWithDefault("ChunkDuration{}".format(chunkIndex), "")
+        if not startTime or not duration:
+            return None
+
+        plan = (float(startTime), float(duration))
+        self.LogInfo("AutoFFmpegTask: Keyframe-aligned chunk start {:.3f}s, duration {:.3f}s".format(*plan))
+        return plan
+
     def CopyFilesToLocal(self, sourcePattern, destDir, startFrame=None, endFrame=None):
-        """Copy files matching pattern to local directory for local rendering"""
-        import glob
-        import shutil
-
-        # Python 2 compatible directory creation
-        if not os.path.exists(destDir):
-            os.makedirs(destDir)
-
-        # Convert sequence pattern to glob pattern
-        # IMPORTANT: Escape brackets before replacing frame numbers, since brackets are glob wildcards
-        # Use placeholders to avoid double-escaping when replacing [ and ]
-        temp_left = '\x00LB\x00'
-        temp_right = '\x00RB\x00'
-        globPattern = sourcePattern.replace('[', temp_left).replace(']', temp_right)
-        globPattern = globPattern.replace(temp_left, '[[]').replace(temp_right, '[]]')
-        globPattern = globPattern.replace('%05d', '*').replace('%04d', '*').replace('%03d', '*')
-
-        self.LogInfo("AutoFFmpegTask: Copying files from '{}' to '{}'".format(globPattern, destDir))
-
-        files = glob.glob(globPattern)
+        """Copy files matching pattern to an existing local directory for local rendering"""
+        self.LogInfo("AutoFFmpegTask: Copying files from '{}' to '{}'".format(sourcePattern, destDir))
+
+        files = findSequenceFiles(sourcePattern, startFrame, endFrame)
         if not files:
-            self.LogWarning("AutoFFmpegTask: No files found matching pattern '{}'".format(globPattern))
+            self.LogWarning("AutoFFmpegTask: No files found matching pattern '{}'".format(sourcePattern))
             return []
 
-        # Filter by frame range if specified
-        if startFrame is not None and endFrame is not None:
-            import re
-            framePattern = re.compile(r'(\d+)\.\w+$')
-            filteredFiles = []
-            for f in files:
-                match = framePattern.search(f)
-                if match:
-                    frameNum = int(match.group(1))
-                    if startFrame <= frameNum <= endFrame:
-                        filteredFiles.append(f)
-            files = filteredFiles
-
-        copiedFiles = []
-        for srcFile in files:
+        def copyOne(srcFile):
             destFile = os.path.join(destDir, os.path.basename(srcFile))
             try:
-                shutil.copy2(srcFile, destFile)
-                copiedFiles.append(destFile)
+                fastCopy(srcFile, destFile)
+                prefetchFile(destFile)
+                return destFile, None
             except Exception as e:
-                self.LogWarning("AutoFFmpegTask: Failed to copy '{}': {}".format(srcFile, e))
+                return srcFile, e
+
+        # Per-file latency dominates on network shares, so overlap many copies at once
+        enableParallelCopy = self.GetConfigEntryWithDefault("EnableParallelCopy", "True").lower() == "true"
+        if enableParallelCopy and len(files) > 1:
+            results = list(self.GetIOExecutor().map(copyOne, files))
+        else:
+            results = [copyOne(srcFile) for srcFile in files]
+
+        # Log after the pool finishes so warnings are not interleaved
+        copiedFiles = []
+        for path, error in results:
+            if error is None:
+                copiedFiles.append(path)
+            else:
+                self.LogWarning("AutoFFmpegTask: Failed to copy '{}': {}".format(path, error))
 
         self.LogInfo("AutoFFmpegTask: Copied {} files to local directory".format(len(copiedFiles)))
         return copiedFiles
 
-    def CopyFileToLocal(self, sourceFile, destDir):
-        """Copy a single file to local directory"""
-        import shutil
+    def PrefetchSequence(self, sourcePattern, startFrame, endFrame):
+        """Start readahead on the chunk's frames from a background thread"""
+        # The share streams the frames while FFmpeg starts up, instead of FFmpeg paying for each cold read
+        if not hasattr(os, 'posix_fadvise'):
+            return
+
+        def prefetchAll():
+            for path in findSequenceFiles(sourcePattern, startFrame, endFrame):
+                prefetchFile(path)
 
-        # Python 2 compatible directory creation
-        if not os.path.exists(destDir):
-            os.makedirs(destDir)
+        self.LogInfo("AutoFFmpegTask: Prefetching frames {}-{} of '{}'".format(startFrame, endFrame, sourcePattern))
+        threading.Thread(target=prefetchAll, name="AutoFFmpegTaskPrefetch", daemon=True).start()
 
+    def CopyFileToLocal(self, sourceFile, destDir):
+        """Copy a single file to an existing local directory"""
         destFile = os.path.join(destDir, os.path.basename(sourceFile))
         try:
-            shutil.copy2(sourceFile, destFile)
+            fastCopy(sourceFile, destFile)
             self.LogInfo("AutoFFmpegTask: Copied '{}' to '{}'".format(sourceFile, destFile))
             return destFile
         except Exception as e:
@@ -290,20 +751,37 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
 
     def CopyFileFromLocal(self, localFile, networkPath):
         """Copy output file from local directory back to network"""
-        import shutil
-
         try:
-            shutil.copy2(localFile, networkPath)
+            fastCopy(localFile, networkPath)
             self.LogInfo("AutoFFmpegTask: Copied output '{}' to '{}'".format(localFile, networkPath))
             return True
         except Exception as e:
             self.LogWarning("AutoFFmpegTask: Failed to copy output '{}': {}".format(localFile, e))
             return False
 
+    def WaitForFileRelease(self, path, timeout=5.0, interval=0.05, watcher=None):
+        """Wait until no other process holds path open, returning False if the timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                # Renaming a file onto itself needs delete access, which Windows refuses while
+                # another process still has it open; elsewhere this is a no-op
+                os.rename(path, path)
+                return True
+            except FileNotFoundError:
+                return True
+            except OSError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Without inotify (Windows) the watcher would only sleep, and longer than interval
+                if watcher is not None and watcher.fd is not None:
+                    watcher.wait(min(remaining, CHUNK_RELEASE_POLL), {os.path.basename(path)})
+                else:
+                    time.sleep(interval)
+
     def CleanupLocalFiles(self, localDir):
         """Remove local rendering directory and all files"""
-        import shutil
-
         try:
             if os.path.exists(localDir):
                 shutil.rmtree(localDir)
@@ -313,12 +791,10 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
 
     def BuildChunkArguments(self, chunkIndex):
         """Build FFmpeg arguments for encoding a single chunk"""
-        inputFile = self.MapPath(self.GetPluginInfoEntry("InputFile0"))
-        outputDir = self.MapPath(self.GetPluginInfoEntry("OutputDirectory"))
-        basename = self.GetPluginInfoEntry("Basename")
-        container = self.GetPluginInfoEntry("Container")
-        inputArgs = self.GetPluginInfoEntry("InputArgs0")
-        outputArgs = self.GetPluginInfoEntry("OutputArgs")
+        inputFile = self._cfg['inputFile']
+        outputDir = self._cfg['outputDir']
+        inputArgs = self._cfg['inputArgs']
+        outputArgs = self._cfg['outputArgs']
 
         # Get chunk-specific parameters
         startFrame = int(self.GetPluginInfoEntry("ChunkStart{}".format(chunkIndex)))
@@ -328,21 +804,38 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
         if hasattr(self, 'localRenderDir') and self.localRenderDir:
             # Update input file to use local directory
             inputFile = os.path.join(self.localInputDir, os.path.basename(inputFile))
-            # Update output to use local directory
-            outputDir = self.localOutputDir
+            # Update output to use local directory, unless the chunk is written straight to the share
+            if self.GetConfigEntryWithDefault("StreamOutputDirect", "False").lower() != "true":
+                outputDir = self.localOutputDir
+
+        # Size the encoder's thread pool to the cores this task may use, unless the user already chose.
+        # GPU encoders barely use the CPU, so only CPU encoders split the cores between concurrent tasks
+        if not re.search(r'(^|\s)-threads\s', " {} {} ".format(inputArgs, outputArgs)):
+            shareCores = HW_ENCODER_PATTERN.search(outputArgs) is None
+            outputArgs = "-threads {} {}".format(self.GetEncoderThreadCount(shareCores), outputArgs)
+
+        # Skip the faststart rewrite pass on the chunk, the concat output gets it instead
+        outputArgs = FASTSTART_PATTERN.sub('', outputArgs)
 
         # Build chunk output filename
-        chunkFile = "{}/{}_chunk{:03d}.{}".format(outputDir, basename, chunkIndex + 1, container)
+        chunkFile = "{}/{}".format(outputDir, self._cfg['chunkNames'][chunkIndex])
 
         # Build arguments
-        # Input args with start frame
-        args = "{} -start_number {} -i \"{}\"".format(inputArgs, startFrame, inputFile)
-
-        # Output args with frame limit
-        args += " -vframes {} {}".format(numFrames, outputArgs)
+        keyframePlan = getattr(self, 'keyframePlan', None)
+        parts = [self.GetGlobalArguments(), inputArgs]
+        if keyframePlan:
+            # Movie input: seek to the chunk's keyframe and cut by time
+            startTime, duration = keyframePlan
+            parts += ["-ss", "{:.6f}".format(startTime), "-i", quoteArgument(inputFile),
+                      "-t", "{:.6f}".format(duration), outputArgs]
+        else:
+            # Input args with start frame, output args with frame limit
+            parts += ["-start_number", str(startFrame), "-i", quoteArgument(inputFile),
+                      "-vframes", str(numFrames), outputArgs]
 
         # Output file
-        args += " -y \"{}\"".format(chunkFile)
+        parts += ["-y", quoteArgument(chunkFile)]
+        args = joinArguments(parts)
 
         self.LogInfo("AutoFFmpegTask: Chunk {} command args: {}".format(chunkIndex + 1, args))
 
@@ -350,82 +843,124 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
 
     def BuildConcatArguments(self):
         """Build FFmpeg arguments for concatenating all chunks"""
-        outputDir = self.MapPath(self.GetPluginInfoEntry("OutputDirectory"))
-        basename = self.GetPluginInfoEntry("Basename")
-        container = self.GetPluginInfoEntry("Container")
-        finalOutput = self.MapPath(self.GetPluginInfoEntry("OutputFile"))
-        numChunks = int(self.GetPluginInfoEntry("NumChunks"))
-
-        # Use local paths if local rendering is enabled
-        if hasattr(self, 'localRenderDir') and self.localRenderDir:
+        outputDir = self._cfg['outputDir']
+        basename = self._cfg['basename']
+        container = self._cfg['container']
+        finalOutput = self._cfg['outputFile']
+        numChunks = self._cfg['numChunks']
+        chunkFiles = self._cfg['posix']
+
+        # Use local paths if the concat inputs were staged locally
+        if self.stageConcatInputs:
             # Chunks are in local input dir, output goes to local output dir
             outputDir = self.localInputDir  # Chunks are here
+            chunkFiles = [os.path.join(outputDir, name).replace(os.sep, '/') for name in self._cfg['chunkNames']]
             finalOutput = os.path.join(self.localOutputDir, os.path.basename(finalOutput))
 
         # Create concat list file
         concatListFile = "{}/{}_concat.txt".format(outputDir, basename)
 
         self.LogInfo("AutoFFmpegTask: Building concat list for {} chunks".format(numChunks))
+
+        # Chunk sizes come from the listing PreRenderTasks already made of the output directory
+        concatPlan = self.concatPlan if self.concatPlan is not None else self.ScanChunks()
+
         missing_chunks = []
-        with open(concatListFile, 'w') as f:
-            for i in range(numChunks):
-                chunkFile = "{}/{}_chunk{:03d}.{}".format(outputDir, basename, i + 1, container)
-                # Normalize path for current OS
-                chunkFile = os.path.normpath(chunkFile)
-
-                # Check if chunk exists
-                if os.path.isfile(chunkFile):
-                    chunk_size = os.path.getsize(chunkFile)
-                    self.LogInfo("AutoFFmpegTask: Chunk {} exists ({} bytes)".format(i + 1, chunk_size))
-                else:
-                    self.LogWarning("AutoFFmpegTask: Chunk {} MISSING: {}".format(i + 1, chunkFile))
-                    missing_chunks.append(i + 1)
+        lines = []
+        for i, chunkFile in enumerate(chunkFiles):
+            # Check if chunk exists
+            chunk_size = concatPlan.get(self._cfg['chunkNames'][i])
+            if chunk_size is not None:
+                self.LogInfo("AutoFFmpegTask: Chunk {} exists ({} bytes)".format(i + 1, chunk_size))
+            else:
+                self.LogWarning("AutoFFmpegTask: Chunk {} MISSING: {}".format(i + 1, chunkFile))
+                missing_chunks.append(i + 1)
 
-                # Write to concat list (always, even if missing - FFmpeg will error if file not found)
-                f.write("file '{}'\n".format(chunkFile.replace("\\", "/")))
+            # Write to concat list (always, even if missing - FFmpeg will error if file not found)
+            lines.append("file '{}'\n".format(chunkFile))
+
+        # One write for the whole list rather than a buffered write per chunk. The concat demuxer
+        # reads UTF-8, and O_BINARY stops Windows from expanding the newlines
+        payload = "".join(lines).encode("utf-8")
+        fd = os.open(concatListFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            written = 0
+            while written < len(payload):
+                written += os.write(fd, payload[written:])
+        finally:
+            os.close(fd)
 
         if missing_chunks:
             self.LogWarning("AutoFFmpegTask: {} chunks are missing: {}".format(len(missing_chunks), missing_chunks))
 
         self.LogInfo("AutoFFmpegTask: Created concat list: {}".format(concatListFile))
 
-        # Log the contents of the concat list for debugging
-        with open(concatListFile, 'r') as f:
-            concat_contents = f.read()
-            self.LogInfo("AutoFFmpegTask: Concat list contents:\n{}".format(concat_contents))
+        # Log the contents of the concat list for debugging, from memory rather than re-reading the share
+        self.LogInfo("AutoFFmpegTask: Concat list contents:\n{}".format("".join(lines)))
 
         # Build concat arguments
-        args = "-f concat -safe 0 -i \"{}\"".format(concatListFile)
+        parts = [self.GetGlobalArguments(), "-f", "concat", "-safe", "0", "-i", quoteArgument(concatListFile)]
 
         # Add audio if specified
-        audioFile = self.GetPluginInfoEntryWithDefault("AudioFile", "")
+        audioFile = self._cfg['audioFile']
         if audioFile:
-            audioFile = self.MapPath(audioFile)
-            # Use local path if local rendering is enabled
-            if hasattr(self, 'localRenderDir') and self.localRenderDir:
+            # Use local path if the concat inputs were staged locally
+            if self.stageConcatInputs:
                 audioFile = os.path.join(self.localInputDir, os.path.basename(audioFile))
-            args += " -i \"{}\"".format(audioFile)
+            parts += ["-i", quoteArgument(audioFile)]
             if container == "mp4":
-                args += " -c:a aac -b:a 192k"
+                parts += ["-c:a", "aac", "-b:a", "192k"]
             else:
-                args += " -c:a pcm_s16le"
+                parts += ["-c:a", "pcm_s16le"]
 
         # Stream copy for video (no re-encoding)
-        args += " -c:v copy -movflags +faststart"
+        parts += ["-c:v", "copy", "-movflags", "+faststart"]
 
         # Output file
-        args += " -y \"{}\"".format(finalOutput)
+        parts += ["-y", quoteArgument(finalOutput)]
+        args = joinArguments(parts)
 
         self.LogInfo("AutoFFmpegTask: Concat command args: {}".format(args))
 
         return args
 
     def PostRenderTasks(self):
-        numChunks = int(self.GetPluginInfoEntry("NumChunks"))
+        numChunks = self._cfg['numChunks']
         currentTask = self.GetStartFrame()
 
         self.LogInfo("AutoFFmpegTask: PostRenderTasks - Task {}/{} completed".format(currentTask, numChunks))
 
+        # Machine-readable counterpart of the lines below, one per task, for pulling stats out of task logs
+        summary = {
+            'job': self.GetJob().JobId,
+            'task': currentTask,
+            'kind': 'concat' if self._cfg['isConcatJob'] or currentTask >= numChunks else 'encode',
+            'elapsed': round(time.monotonic() - self.taskStartTime, 3),
+        }
+
+        if self.lastProgress:
+            self.LogInfo("AutoFFmpegTask: Final progress: {}".format(self.lastProgress))
+            progress = PROGRESS_PATTERN.search(self.lastProgress)
+            if progress:
+                summary['frames'] = int(progress.group(1))
+            # FFmpeg's speed figure is cumulative, so the last progress line holds the task's average
+            speed = SPEED_PATTERN.search(self.lastProgress)
+            if speed:
+                self.LogInfo("AutoFFmpegTask: Average encode speed: {}x realtime".format(speed.group(1)))
+                summary['speed'] = float(speed.group(1))
+
+        # The cumulative figure above is skewed by warm-up on short chunks; the median of the later half
+        # of the per-interval samples is the steady-state rate, min/max expose throttling
+        if self.speedSamples:
+            samples = list(self.speedSamples)
+            summary['steadySpeed'] = round(statistics.median(samples[len(samples) // 2:]), 3)
+            summary['minSpeed'] = round(min(samples), 3)
+            summary['maxSpeed'] = round(max(samples), 3)
+            self.LogInfo("AutoFFmpegTask: Steady-state encode speed: {:.2f}x realtime (min {:.2f}x, max {:.2f}x, {} samples)".format(
+                summary['steadySpeed'], summary['minSpeed'], summary['maxSpeed'], len(samples)))
+
+        self.LogInfo("AutoFFmpegTask: Summary {}".format(json.dumps(summary)))
+
         # Handle local rendering: copy output back to network and cleanup
         if hasattr(self, 'localRenderDir') and self.localRenderDir:
             enableLocalRendering = self.GetConfigEntryWithDefault("EnableLocalRendering", "False").lower() == "true"
@@ -435,26 +970,28 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
                 self.LogInfo("AutoFFmpegTask: Copying output files back to network")
 
                 # Determine what to copy back based on job type
-                isEncodingJob = self.GetPluginInfoEntryWithDefault("IsEncodingJob", "False") == "True"
-                isConcatJob = self.GetPluginInfoEntryWithDefault("IsConcatJob", "False") == "True"
+                isEncodingJob = self._cfg['isEncodingJob']
+                isConcatJob = self._cfg['isConcatJob']
 
-                if isEncodingJob:
+                if isEncodingJob and self.GetConfigEntryWithDefault("StreamOutputDirect", "False").lower() == "true":
+                    self.LogInfo("AutoFFmpegTask: Chunk was written directly to the network, nothing to copy back")
+
+                elif isEncodingJob:
                     # Copy chunk file back
-                    basename = self.GetPluginInfoEntry("Basename")
-                    container = self.GetPluginInfoEntry("Container")
-                    chunkFilename = "{}_chunk{:03d}.{}".format(basename, currentTask+1, container)
-                    localChunkFile = os.path.join(self.localOutputDir, chunkFilename)
-                    networkOutputDir = self.MapPath(self.GetPluginInfoEntry("OutputDirectory"))
-                    networkChunkFile = os.path.join(networkOutputDir, chunkFilename)
+                    localChunkFile = os.path.join(self.localOutputDir, self._cfg['chunkNames'][currentTask])
+                    networkChunkFile = self._cfg['native'][currentTask]
 
                     if os.path.exists(localChunkFile):
                         self.CopyFileFromLocal(localChunkFile, networkChunkFile)
                     else:
                         self.LogWarning("AutoFFmpegTask: Local chunk file not found: {}".format(localChunkFile))
 
+                elif (isConcatJob or currentTask >= numChunks) and not self.stageConcatInputs:
+                    self.LogInfo("AutoFFmpegTask: Concat output was written directly to the network, nothing to copy back")
+
                 elif isConcatJob or currentTask >= numChunks:
                     # Copy final output file back
-                    finalOutput = self.MapPath(self.GetPluginInfoEntry("OutputFile"))
+                    finalOutput = self._cfg['outputFile']
                     localFinalOutput = os.path.join(self.localOutputDir, os.path.basename(finalOutput))
 
                     if os.path.exists(localFinalOutput):
@@ -469,95 +1006,110 @@ class AutoFFmpegTaskPlugin(DeadlinePlugin):
         # If this was the concat task, optionally clean up chunks
         # For combined jobs: concat task is currentTask >= numChunks
         # For separate concat job: IsConcatJob is True and currentTask is 0
-        isConcatJob = self.GetPluginInfoEntryWithDefault("IsConcatJob", "False").lower() == "true"
+        isConcatJob = self._cfg['isConcatJob']
         isConcatTask = isConcatJob or (currentTask >= numChunks)
 
         if isConcatTask:
-            keepChunks = self.GetPluginInfoEntryWithDefault("KeepChunks", "False").lower() == "true"
+            keepChunks = self._cfg['keepChunks']
             self.LogInfo("AutoFFmpegTask: Concat task finished (isConcatJob={}, currentTask={}, numChunks={}). KeepChunks={}".format(isConcatJob, currentTask, numChunks, keepChunks))
 
             if not keepChunks:
-                outputDir = self.GetPluginInfoEntry("OutputDirectory")
-                basename = self.GetPluginInfoEntry("Basename")
-                container = self.GetPluginInfoEntry("Container")
-
-                # Normalize the output directory for the current OS
-                outputDir = os.path.normpath(outputDir)
+                outputDir = self._cfg['outputDir']
+                basename = self._cfg['basename']
+                container = self._cfg['container']
 
                 self.LogInfo("AutoFFmpegTask: Cleaning up {} chunks from: {}".format(numChunks, outputDir))
                 self.LogInfo("AutoFFmpegTask: Basename: {}, Container: {}".format(basename, container))
 
-                # Longer initial delay to let FFmpeg fully release file handles
-                time.sleep(5)
-
+                # Only chunks that existed when the task started; missing ones need no delete attempt
+                concatPlan = self.concatPlan if self.concatPlan is not None else self.ScanChunks()
+                chunkNames = [name for name in self._cfg['chunkNames'] if name in concatPlan]
+                # The concat list shares the chunks' delete budget
+                sidecarNames = ["{}_concat.txt".format(basename)]
+
+                # Watch before the first check so a close that lands in between still wakes us
+                watcher = CloseWatcher(outputDir)
+                try:
+                    # Wait (up to 5 seconds) for FFmpeg to release its handle on the chunks
+                    if chunkNames and not self.WaitForFileRelease(os.path.join(outputDir, chunkNames[0]), timeout=5.0, watcher=watcher):
+                        self.LogWarning("AutoFFmpegTask: Chunk files still locked after 5 seconds, attempting cleanup anyway")
+
+                    # One pass over every chunk first; only the ones that fail are retried
+                    lockedFiles = unlinkBatch(outputDir, chunkNames + sidecarNames, self.GetIOExecutor())
+                    lockedChunkCount = sum(1 for name in lockedFiles if name not in sidecarNames)
+                    self.LogInfo("AutoFFmpegTask: Deleted {} of {} chunks on the first pass".format(
+                        len(chunkNames) - lockedChunkCount, len(chunkNames)))
+
+                    # Retry whenever a file in the directory is closed. The budget covers every pending
+                    # file together, so the worst case stays ChunkDeleteTimeout however many are locked
+                    deleteTimeout = self.GetFloatConfigEntry("ChunkDeleteTimeout", CHUNK_DELETE_TIMEOUT)
+                    if lockedFiles:
+                        self.LogInfo("AutoFFmpegTask: Waiting up to {:.0f} seconds for {} locked files: {}".format(
+                            deleteTimeout, len(lockedFiles), lockedFiles))
+                    deadline = time.monotonic() + deleteTimeout
+                    while lockedFiles:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        watcher.wait(min(remaining, CHUNK_RELEASE_POLL), lockedFiles)
+                        lockedFiles = unlinkBatch(outputDir, list(lockedFiles), self.GetIOExecutor())
+                finally:
+                    watcher.close()
+
+                # One pass over whatever is still locked (usually nothing) rather than over every chunk
                 failed_chunks = []
-                for i in range(numChunks):
-                    chunkFilename = "{}_chunk{:03d}.{}".format(basename, i + 1, container)
-                    chunkFile = os.path.join(outputDir, chunkFilename)
-
-                    self.LogInfo("AutoFFmpegTask: Attempting to delete: {}".format(chunkFile))
-
-                    # More aggressive retry logic with exponential backoff
-                    deleted = False
-                    max_retries = 15
-                    for attempt in range(max_retries):
-                        try:
-                            if os.path.exists(chunkFile):
-                                os.remove(chunkFile)
-                                self.LogInfo("AutoFFmpegTask: Successfully deleted chunk {} on attempt {}".format(i + 1, attempt + 1))
-                                deleted = True
-                                break
-                            else:
-                                self.LogInfo("AutoFFmpegTask: Chunk file already removed: {}".format(chunkFilename))
-                                deleted = True
-                                break
-                        except Exception as e:
-                            if attempt < max_retries - 1:
-                                # Exponential backoff: 2, 4, 8 seconds, then cap at 10 seconds
-                                delay = min(2 ** (attempt + 1), 10)
-                                self.LogInfo("AutoFFmpegTask: Retry {}/{} - waiting {} seconds for file lock to release...".format(
-                                    attempt + 1, max_retries, delay))
-                                time.sleep(delay)
-                            else:
-                                self.LogWarning("AutoFFmpegTask: Could not delete after {} attempts: {}".format(max_retries, str(e)))
-                                failed_chunks.append(chunkFilename)
+                for name, error in lockedFiles.items():
+                    if name in sidecarNames:
+                        self.LogWarning("AutoFFmpegTask: Failed to delete {}: {}".format(name, error))
+                    else:
+                        failed_chunks.append(name)
 
                 # Report failed deletions
                 if failed_chunks:
                     self.LogWarning("AutoFFmpegTask: Failed to delete {} chunks: {}".format(
                         len(failed_chunks), ', '.join(failed_chunks)))
                 else:
-                    self.LogInfo("AutoFFmpegTask: Successfully deleted all {} chunks".format(numChunks))
-
-                # Also delete concat list
-                concatListFilename = "{}_concat.txt".format(basename)
-                concatListFile = os.path.join(outputDir, concatListFilename)
-                for attempt in range(3):
-                    try:
-                        if os.path.exists(concatListFile):
-                            os.remove(concatListFile)
-                            self.LogInfo("AutoFFmpegTask: Deleted concat list")
-                        break
-                    except Exception as e:
-                        if attempt < 2:
-                            time.sleep(0.5)
-                        else:
-                            self.LogWarning("AutoFFmpegTask: Could not delete concat list: {}".format(str(e)))
+                    self.LogInfo("AutoFFmpegTask: Successfully deleted all {} chunks".format(len(chunkNames)))
             else:
                 self.LogInfo("AutoFFmpegTask: KeepChunks is True, skipping cleanup")
 
-    def HandleStdoutError(self):
-        # FFmpeg outputs to stderr, not stdout
-        pass
-
-    def HandleStderrData(self):
-        # Process FFmpeg output
+    def HandleError(self):
+        # Logged once as a warning instead of also being echoed as a plain stdout line
+        self.SuppressThisLine()
+        self.LogWarning(self.GetRegexMatch(0))
+
+    def RecordSpeedSample(self, data):
+        """Add the encode speed since the previous progress line to the speed timeline"""
+        match = TIME_PATTERN.search(data)
+        speed = SPEED_PATTERN.search(data)
+        if not match or not speed or float(speed.group(1)) <= 0:
+            return
+        outputTime = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+        # FFmpeg's own elapsed time (its speed is time / elapsed), since lines reach the handler in bursts
+        # and the gaps between callbacks say nothing about the encode
+        elapsed = outputTime / float(speed.group(1))
+        if self.lastTimeSample:
+            lastElapsed, lastOutputTime = self.lastTimeSample
+            if elapsed > lastElapsed:
+                self.speedSamples.append((outputTime - lastOutputTime) / (elapsed - lastElapsed))
+        self.lastTimeSample = (elapsed, outputTime)
+
+    def HandleProgress(self):
+        # Log progress, at most about once per PROGRESS_LOG_INTERVAL or StatsPeriod, whichever is longer
         data = self.GetRegexMatch(0)
-
-        # Check for errors
-        if "error" in data.lower():
-            self.LogWarning(data)
-
-        # Log progress
-        if "frame=" in data:
+        self.lastProgress = data.strip()
+        self.SuppressThisLine()
+
+        self.RecordSpeedSample(data)
+        now = time.monotonic()
+        if now - self.lastProgressTime < self.progressLogInterval:
+            return
+        self.lastProgressTime = now
+
+        match = PROGRESS_PATTERN.search(data)
+        if match:
+            speed = SPEED_PATTERN.search(data, match.end())
+            self.LogInfo("AutoFFmpegTask: frame={} fps={}{}".format(
+                match.group(1), match.group(2), " speed={}x".format(speed.group(1)) if speed else ""))
+        else:
             self.LogInfo(data)